@@ -0,0 +1,19 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+@dataclass(frozen=True)
+class EvolutionConfig:
+    api_url: str
+    api_key: str
+
+@lru_cache(maxsize=1)
+def get_evolution_config() -> EvolutionConfig:
+    """Evolution API settings, read from the environment once per process"""
+    return EvolutionConfig(
+        api_url=os.getenv("EVOLUTION_API_URL", "http://localhost:8081"),
+        api_key=os.getenv("EVOLUTION_API_KEY", "74BDBE32-21C5-44F9-B084-8844C749EEC5")
+    )
@@ -0,0 +1,22 @@
+import httpx
+
+# Shared keep-alive client for all calls to WPPConnect / Evolution API.
+# Closed by the app lifespan in main.py.
+_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _client
+
+async def close_http_client() -> None:
+    """Close the shared client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
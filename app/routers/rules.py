@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlmodel import Session, select
 from app.database import get_session
 from app.models import BusinessRule, Business
+from brain.sales_agent import invalidate_rules_cache
 from typing import List
 from pydantic import BaseModel
 
@@ -27,6 +28,7 @@ def create_rule(rule_data: CreateRuleRequest, session: Session = Depends(get_ses
     session.add(rule)
     session.commit()
     session.refresh(rule)
+    invalidate_rules_cache(rule.business_id)
     return rule
 
 @router.get("/business/{business_id}", response_model=List[BusinessRule])
@@ -59,6 +61,7 @@ def update_rule(rule_id: int, rule_data: BusinessRule, session: Session = Depend
     
     session.commit()
     session.refresh(rule)
+    invalidate_rules_cache(rule.business_id)
     return rule
 
 @router.delete("/{rule_id}")
@@ -70,4 +73,5 @@ def delete_rule(rule_id: int, session: Session = Depends(get_session)):
     
     session.delete(rule)
     session.commit()
+    invalidate_rules_cache(rule.business_id)
     return {"message": "Rule deleted successfully"}
\ No newline at end of file
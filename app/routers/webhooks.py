@@ -1,8 +1,13 @@
 import json
+import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, Any
+import asyncio
 import redis
+import redis.asyncio as aioredis
 
 from fastapi import APIRouter, Request, HTTPException
 from sqlmodel import Session, select
@@ -11,6 +16,8 @@ from app.database import engine
 from app.models import Business
 from brain.sales_agent import SalesAgent
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
 
 # Initialize sales agent
@@ -19,11 +26,45 @@ sales_agent = SalesAgent()
 # Redis for message deduplication
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379")
 try:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
+    # Async client with short timeouts so a missing Redis never stalls the event loop
+    redis_client = aioredis.from_url(
+        redis_url,
+        decode_responses=True,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5
+    )
 except:
     redis_client = None
-    print("Redis not available - using memory deduplication")
-    message_history = {}
+    logger.warning("Redis not available - using memory deduplication")
+
+# In-memory fallback: message id -> first seen (monotonic), oldest first
+message_history = OrderedDict()
+DEDUP_TTL = 30
+
+# After a Redis failure, use the memory fallback for this long before retrying
+REDIS_RETRY_AFTER = 30
+_redis_down_until = 0.0
+
+async def _is_duplicate(message_id: str) -> bool:
+    """True if this message id was already delivered within DEDUP_TTL seconds"""
+    global _redis_down_until
+    if not message_id:
+        return False
+    
+    if redis_client and time.monotonic() >= _redis_down_until:
+        try:
+            return not await redis_client.set(f"dedup:{message_id}", 1, nx=True, ex=DEDUP_TTL)
+        except (redis.RedisError, OSError, asyncio.TimeoutError) as e:
+            _redis_down_until = time.monotonic() + REDIS_RETRY_AFTER
+            logger.warning("Redis unavailable (%s) - using memory deduplication", e)
+    
+    now = time.monotonic()
+    while message_history and now - next(iter(message_history.values())) > DEDUP_TTL:
+        message_history.popitem(last=False)
+    if message_id in message_history:
+        return True
+    message_history[message_id] = now
+    return False
 
 @router.post("/wppconnect")
 async def wppconnect_webhook(request: Request):
@@ -38,16 +79,19 @@ async def wppconnect_webhook(request: Request):
         # Extract message
         msg = data.get("response", {})
         
+        # Drop redeliveries of the same message (WPPConnect retries webhooks)
+        if await _is_duplicate(msg.get("id")):
+            return {"status": "duplicate"}
+        
         # Status Detection: Check if response.quotedMsg.from contains "status@broadcast"
         quoted = msg.get("quotedMsg", {})
         if "status@broadcast" in (quoted.get("from") or ""):
-            print("Status Reply Detected")
-            print(f"Body: {msg.get('body')}")
+            logger.info("Status Reply Detected - body: %s", msg.get("body"))
         
         return {"status": "success"}
         
     except Exception as e:
-        print(f"Webhook error: {e}")
+        logger.exception("Webhook error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/health")
@@ -1,42 +1,83 @@
 import os
 import json
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Fenced model output; a ```json fence wins over a plain one, and an unclosed
+# fence runs to the end of the reply
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)(?:```|\Z)", re.DOTALL)
+_FENCE_RE = re.compile(r"```\s*(.*?)(?:```|\Z)", re.DOTALL)
+
+# Max vision analyses kept in memory (many customers reply to the same status)
+ANALYSIS_CACHE_SIZE = 256
+
+VISION_PROMPT_TMPL = """You are the 'Auto-Closer' AI. IMAGE: A WhatsApp Status posted by a vendor. TEXT: A customer's reply to this specific status: '{user_text}'. VENDOR RULES: {rules_context} YOUR TASK:
+
+Identify the item in the image. Does it match any vendor rule category?
+
+IGNORE 'Sold Out' stickers if the user asks 'Do you have more?'.
+
+Formulate a short, friendly, Nigerian-business style reply based on the Rule's 'negotiation_instruction'.
+
+OUTPUT JSON ONLY: {{ 'detected_category': 'string', 'confidence': float, 'reply': 'string (the actual message to send)', 'is_sales_lead': bool }}"""
+
 class LlamaClient:
+    # Groq clients shared process-wide, keyed by API key and created on first use
+    _clients = {}
+    _clients_lock = threading.Lock()
+    
     def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            print("Warning: GROQ_API_KEY not found")
-            self.client = None
-        else:
-            try:
-                from groq import Groq
-                self.client = Groq(api_key=api_key)
-            except ImportError:
-                print("Groq library not available")
-                self.client = None
+        self.api_key = os.getenv("GROQ_API_KEY")
+        if not self.api_key:
+            logger.warning("GROQ_API_KEY not found")
         self.vision_model = "llama-3.2-11b-vision-preview"
         self.text_model = "llama-3.3-70b-versatile"
+        # LRU of successful analyses; guarded by a lock since calls run in executor threads
+        self._analysis_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """Shared Groq client, or None if no key / library is available"""
+        if not self.api_key:
+            return None
+        with self._clients_lock:
+            if self.api_key not in self._clients:
+                try:
+                    from groq import Groq
+                    self._clients[self.api_key] = Groq(api_key=self.api_key)
+                except ImportError:
+                    logger.warning("Groq library not available")
+                    self._clients[self.api_key] = None
+            return self._clients[self.api_key]
     
     def analyze_image_context(self, image_url: str, user_text: str, rules_context: str) -> dict:
         """Analyze WhatsApp status image with Vision AI"""
-        if not self.client:
+        client = self.client
+        if not client:
             return {"detected_category": "unknown", "confidence": 0.0, "reply": "System unavailable", "is_sales_lead": False}
         
-        prompt = f"""You are the 'Auto-Closer' AI. IMAGE: A WhatsApp Status posted by a vendor. TEXT: A customer's reply to this specific status: '{user_text}'. VENDOR RULES: {rules_context} YOUR TASK:
-
-Identify the item in the image. Does it match any vendor rule category?
-
-IGNORE 'Sold Out' stickers if the user asks 'Do you have more?'.
-
-Formulate a short, friendly, Nigerian-business style reply based on the Rule's 'negotiation_instruction'.
-
-OUTPUT JSON ONLY: {{ 'detected_category': 'string', 'confidence': float, 'reply': 'string (the actual message to send)', 'is_sales_lead': bool }}"""
+        cache_key = hashlib.blake2b(
+            "\x1f".join((image_url, user_text, rules_context)).encode(), digest_size=16
+        ).digest()
+        with self._cache_lock:
+            cached = self._analysis_cache.get(cache_key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(cache_key)
+                return dict(cached)
+        
+        prompt = VISION_PROMPT_TMPL.format_map({"user_text": user_text, "rules_context": rules_context})
         
         try:
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = client.chat.completions.create(
                 messages=[
                     {
                         "role": "user",
@@ -53,16 +94,25 @@ OUTPUT JSON ONLY: {{ 'detected_category': 'string', 'confidence': float, 'reply'
             
             response = chat_completion.choices[0].message.content
             
-            # Parse JSON response
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0].strip()
+            # Parse JSON response (strip a ```json / ``` fence if present)
+            fenced = _JSON_FENCE_RE.search(response) or _FENCE_RE.search(response)
+            if fenced:
+                response = fenced.group(1).strip()
+            
+            analysis = json.loads(response)
+            if not isinstance(analysis, dict):
+                raise ValueError(f"expected a JSON object, got {type(analysis).__name__}")
+            
+            # Cache a private copy; the caller gets the parsed object itself
+            with self._cache_lock:
+                self._analysis_cache[cache_key] = dict(analysis)
+                if len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
             
-            return json.loads(response)
+            return analysis
             
         except Exception as e:
-            print(f"Vision AI error: {e}")
+            logger.exception("Vision AI error: %s", e)
             return {
                 "detected_category": "unknown",
                 "confidence": 0.0,
@@ -1,38 +1,119 @@
 from sqlmodel import Session, select
 from app.database import engine
+from app.config import get_evolution_config
+from app.http_client import get_http_client
 from app.models import Customer, BusinessRule, StatusReply, Business
 from brain.llama_client import LlamaClient
 from datetime import datetime
-import httpx
-import os
+import logging
+import time
 import asyncio
 
+logger = logging.getLogger(__name__)
+
+# Rules context per business, cached briefly so every status reply doesn't
+# re-query the rules table. Invalidated by the rules router on writes.
+_rules_cache = {}
+
+# Evolution API statuses worth retrying (rate limited / transient upstream errors)
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_NAIRA = "₦{:,.0f}".format
+
+def invalidate_rules_cache(business_id: int = None):
+    """Drop cached rules context for one business (or all)"""
+    if business_id is None:
+        _rules_cache.clear()
+    else:
+        _rules_cache.pop(business_id, None)
+
+def _get_rules_context(session: Session, business_id: int, ttl: float = 30) -> str:
+    """Return formatted active rules for a business, cached for `ttl` seconds"""
+    cached = _rules_cache.get(business_id)
+    if cached and time.monotonic() - cached["ts"] < ttl:
+        return cached["value"]
+    
+    rules = session.exec(
+        select(BusinessRule).where(
+            BusinessRule.is_active == True,
+            BusinessRule.business_id == business_id
+        )
+    ).all()
+    
+    # Format rules context
+    rules_context = "\n".join(
+        f"Category: {rule.category}, Keywords: {rule.visual_keywords}, Min Price: {_NAIRA(rule.min_price)}, Instructions: {rule.negotiation_instruction}"
+        for rule in rules
+    )
+    
+    if not rules_context:
+        rules_context = "No specific rules configured. Respond helpfully to customer inquiries."
+    
+    # Cache the plain string, not ORM rows, so nothing is bound to this session
+    _rules_cache[business_id] = {"value": rules_context, "ts": time.monotonic()}
+    return rules_context
+
 class SalesAgent:
     def __init__(self):
         self.llama_client = LlamaClient()
+        # Strong refs to in-flight background sends so they aren't GC'd mid-flight
+        self._pending_sends = set()
     
-    async def _send_whatsapp_message(self, phone: str, message: str, instance_name: str) -> dict:
-        """Send message via Evolution API"""
+    async def _send_whatsapp_message(self, phone: str, message: str, instance_name: str, retries: int = 2, delay: float = 1.0) -> dict:
+        """Send message via Evolution API, retrying on 429/5xx"""
         try:
-            url = f"{os.getenv('EVOLUTION_API_URL')}/message/sendText/{instance_name}"
-            headers = {"apikey": os.getenv("EVOLUTION_API_KEY")}
+            config = get_evolution_config()
+            url = f"{config.api_url}/message/sendText/{instance_name}"
+            headers = {"apikey": config.api_key}
             payload = {
                 "number": phone,
                 "textMessage": {"text": message}
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
+            for attempt in range(retries + 1):
+                response = await get_http_client().post(url, json=payload, headers=headers, timeout=10.0)
+                if response.status_code in RETRYABLE_STATUS and attempt < retries:
+                    await asyncio.sleep(delay * (attempt + 1))
+                    continue
                 return response.json()
         except Exception as e:
-            print(f"Error sending WhatsApp message: {e}")
+            logger.exception("Error sending WhatsApp message: %s", e)
             return {"error": str(e)}
     
+    def _queue_whatsapp_message(self, phone: str, message: str, instance_name: str) -> None:
+        """Send in the background so the caller doesn't wait on the Evolution API"""
+        task = asyncio.create_task(self._send_whatsapp_message(phone, message, instance_name))
+        self._pending_sends.add(task)
+        task.add_done_callback(self._pending_sends.discard)
+    
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Wait for in-flight background sends (cancelling stragglers) before shutdown"""
+        if not self._pending_sends:
+            return
+        done, pending = await asyncio.wait(set(self._pending_sends), timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Cancelled %d WhatsApp sends still pending at shutdown", len(pending))
+            await asyncio.gather(*pending, return_exceptions=True)
+    
     async def process_status_reply(self, business_id: int, instance_name: str, customer_phone: str, image_url: str, user_message: str) -> str:
         """Process customer reply to WhatsApp status"""
         
         with Session(engine) as session:
-            # Get or create customer for this business
+            # Get active business rules for this business (cached)
+            rules_context = _get_rules_context(session, business_id)
+            
+            # Analyze image with Vision AI (sync call in thread)
+            loop = asyncio.get_event_loop()
+            analysis = await loop.run_in_executor(
+                None, 
+                self.llama_client.analyze_image_context, 
+                image_url, user_message, rules_context
+            )
+            
+            # Get or create customer for this business. New customers are only
+            # flushed (for the id) so everything below lands in one commit.
             customer = session.exec(
                 select(Customer).where(
                     Customer.phone == customer_phone,
@@ -46,32 +127,7 @@ class SalesAgent:
                     phone=customer_phone
                 )
                 session.add(customer)
-                session.commit()
-                session.refresh(customer)
-            
-            # Get active business rules for this business
-            rules = session.exec(
-                select(BusinessRule).where(
-                    BusinessRule.is_active == True,
-                    BusinessRule.business_id == business_id
-                )
-            ).all()
-            
-            # Format rules context
-            rules_context = ""
-            for rule in rules:
-                rules_context += f"Category: {rule.category}, Keywords: {rule.visual_keywords}, Min Price: ₦{rule.min_price:,.0f}, Instructions: {rule.negotiation_instruction}\\n"
-            
-            if not rules_context:
-                rules_context = "No specific rules configured. Respond helpfully to customer inquiries."
-            
-            # Analyze image with Vision AI (sync call in thread)
-            loop = asyncio.get_event_loop()
-            analysis = await loop.run_in_executor(
-                None, 
-                self.llama_client.analyze_image_context, 
-                image_url, user_message, rules_context
-            )
+                session.flush()
             
             # Save status reply
             status_reply = StatusReply(
@@ -98,8 +154,8 @@ class SalesAgent:
             customer.updated_at = datetime.utcnow()
             session.commit()
             
-            # Send response via WhatsApp
+            # Send response via WhatsApp (fire-and-forget)
             reply_message = analysis.get("reply", "Thanks for your interest! Please send me a message to discuss.")
-            await self._send_whatsapp_message(customer_phone, reply_message, instance_name)
+            self._queue_whatsapp_message(customer_phone, reply_message, instance_name)
             
             return reply_message
\ No newline at end of file
@@ -1,11 +1,39 @@
 from fastapi import FastAPI
 from app.database import create_db_and_tables
+from app.http_client import close_http_client
 from app.routers import webhooks, rules, onboarding, qr
 from contextlib import asynccontextmanager
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Tuple
+
+def configure_logging() -> Tuple[logging.Handler, logging.handlers.QueueListener]:
+    """Route app logs through a queue so request handlers never block on the stream"""
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    # httpx logs every request at INFO; keep only its warnings
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    root.addHandler(queue_handler)
+    return queue_handler, logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+def shutdown_logging(queue_handler: logging.Handler, listener: logging.handlers.QueueListener) -> None:
+    """Detach the queue handler and flush remaining records"""
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    log_handler, log_listener = configure_logging()
+    log_listener.start()
     print("🚀 Starting Auto-Closer v3.0.0...")
     create_db_and_tables()
     print("✅ Database initialized")
@@ -13,8 +41,11 @@ async def lifespan(app: FastAPI):
     print("📱 WhatsApp webhook ready")
     print("🧠 Redis memory active")
     yield
-    # Shutdown
+    # Shutdown: let queued sends finish before their HTTP client goes away
+    await webhooks.sales_agent.drain()
+    await close_http_client()
     print("👋 Auto-Closer shutting down...")
+    shutdown_logging(log_handler, log_listener)
 
 app = FastAPI(
     title="Auto-Closer",